@@ -24,7 +24,7 @@ class DiskCache(Cache):
 
     def put(self, key: str, state: dict[str, Any]) -> None:
         k = f"{self._prefix}{key}"
-        self._cache.set(k, value=pickle.dumps(state), tag=self._prefix)
+        self._cache.set(k, value=pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), tag=self._prefix)
 
     def get(self, key: str, default: dict[str, Any] | None = None) -> dict[str, Any]:
         k = f"{self._prefix}{key}"
@@ -1,16 +1,26 @@
+import hashlib
+import json
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Literal
 
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, SecretBytes, SecretStr
+from pydantic_core import PydanticSerializationError, to_jsonable_python
 from typing_extensions import Self
 
 _OPENAI_PREFIXES = ["gpt", "o1", "o3", "o4"]
 _ANTHROPIC_PREFIXES = ["claude", "anthropic"]
 _OPENAI_REASONING_INFIXES = ["o1", "o3", "o4", "gpt-5", "openai/gpt-oss"]
 
+_CHAT_MODEL_CACHE_SIZE = 32
+# Chat models shared between equal configs (least recently used first), keyed by a digest of the config and environment.
+_chat_models: OrderedDict[str, BaseChatModel] = OrderedDict()
+_chat_models_lock = threading.Lock()
+
 
 # TODO: add a config folder for LLM configs, make it initializable from hydra configs
 class LLMConfig(BaseModel):
@@ -63,6 +73,56 @@ class LLMConfig(BaseModel):
         else:
             return self.timeout
 
+    def chat_model(self) -> BaseChatModel:
+        """Return a chat model for this config, shared with every equal config.
+
+        Creating a chat model sets up HTTP clients (and may pull Ollama models), so the Agent and its
+        executors reuse one instance instead of each creating their own. Use `new_chat_model` for a fresh one.
+
+        Provider clients read their API keys and endpoints from the environment when created. Changing a
+        `*_API_KEY`, `*_API_BASE`, `*_BASE_URL` or `OLLAMA_HOST` variable yields a new model; other environment
+        changes are not picked up by an already cached model.
+        """
+        try:
+            key = self._chat_model_cache_key()
+        except (PydanticSerializationError, TypeError, ValueError):
+            # model_kwargs holds objects that can't be serialized into a key
+            return self.new_chat_model()
+        with _chat_models_lock:
+            model = _chat_models.get(key)
+            if model is not None:
+                _chat_models.move_to_end(key)
+                return model
+        # Created without holding the lock, since it may pull an Ollama model over the network
+        model = self.new_chat_model()
+        # new_chat_model may export the API key to the environment, so key the model by the resulting state
+        key = self._chat_model_cache_key()
+        with _chat_models_lock:
+            # Another thread may have created a model for this key in the meantime, share the first one
+            model = _chat_models.setdefault(key, model)
+            _chat_models.move_to_end(key)
+            if len(_chat_models) > _CHAT_MODEL_CACHE_SIZE:
+                _chat_models.popitem(last=False)
+        return model
+
+    def _chat_model_cache_key(self) -> str:
+        """Digest of the config and the environment variables chat models are configured from.
+
+        Hashed so that API keys from the config or environment are not kept in the cache in plain text.
+        """
+        env = sorted(
+            (name, value)
+            for name, value in os.environ.items()
+            if name.endswith(("_API_KEY", "_API_BASE", "_BASE_URL")) or name == "OLLAMA_HOST"
+        )
+        h = hashlib.sha256()
+        h.update(f"{type(self).__module__}.{type(self).__qualname__}".encode())
+        # model_dump_json would mask secrets as "**********", making configs with different keys collide
+        h.update(json.dumps(self.model_dump(), sort_keys=True, default=_reveal_secrets_json_default).encode())
+        for name, value in env:
+            h.update(f"\0{name}={value}".encode())
+        return h.hexdigest()
+
     def new_chat_model(self) -> BaseChatModel:
         """Create a chat model from this config using init_chat_model for provider detection."""
         provider, name = _parse_model_provider(self.name)
@@ -153,6 +213,17 @@ class LLMConfig(BaseModel):
         return cls.model_validate(model_dict)
 
 
+def _reveal_secrets_json_default(obj: Any) -> Any:
+    """`json.dumps` fallback that keeps secret values (and those nested in models) instead of masking them."""
+    if isinstance(obj, SecretStr):
+        return obj.get_secret_value()
+    if isinstance(obj, SecretBytes):
+        return obj.get_secret_value().hex()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return to_jsonable_python(obj)
+
+
 def _is_reasoning_model(model_name: str) -> bool:
     """Check if a model is a reasoning model based on its name."""
     return any(prefix in model_name for prefix in _OPENAI_REASONING_INFIXES)
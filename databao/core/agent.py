@@ -1,4 +1,6 @@
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 from duckdb import DuckDBPyConnection
@@ -37,7 +39,7 @@ class Agent:
         auto_output_modality: bool = True,
     ):
         self.__name = name
-        self.__llm = llm.new_chat_model()
+        self.__llm = llm.chat_model()
         self.__llm_config = llm
 
         self.__sources: Sources = Sources(dfs={}, dbs={}, additional_context=[])
@@ -151,12 +153,12 @@ class Agent:
         return self.__sources
 
     @property
-    def dbs(self) -> dict[str, DBDataSource]:
-        return dict(self.__sources.dbs)
+    def dbs(self) -> Mapping[str, DBDataSource]:
+        return MappingProxyType(self.__sources.dbs)
 
     @property
-    def dfs(self) -> dict[str, DFDataSource]:
-        return dict(self.__sources.dfs)
+    def dfs(self) -> Mapping[str, DFDataSource]:
+        return MappingProxyType(self.__sources.dfs)
 
     @property
     def name(self) -> str:
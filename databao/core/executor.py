@@ -14,6 +14,9 @@ if TYPE_CHECKING:
     from databao.core.opa import Opa
 
 
+_DATAFRAME_CLASS_ATTR_RE = re.compile(r'\s*class="dataframe"')
+
+
 class OutputModalityHints(BaseModel):
     """Hints on how to present the execution results.
 
@@ -33,6 +36,12 @@ class OutputModalityHints(BaseModel):
     visualization_prompt: str | None = None
     """Optional visualization prompt to be used by a Visualizer to generate a plot."""
 
+    model_config = ConfigDict(frozen=True)
+
+
+DEFAULT_OUTPUT_MODALITY_HINTS = OutputModalityHints()
+"""Shared hints for results that carry none; safe to reuse since the model is frozen."""
+
 
 class ExecutionResult(BaseModel):
     """Immutable result of a single agent/executor step.
@@ -65,7 +74,7 @@ class ExecutionResult(BaseModel):
         # Workaround due to a bug in PyCharm notebooks (https://youtrack.jetbrains.com/issue/PY-85679),
         # where using _repr_html_ would prevent other <details> sections from being shown.
         df_html = df.to_html(notebook=False, max_rows=10)
-        df_html = re.sub(r'\s*class="dataframe"', "", df_html)
+        df_html = _DATAFRAME_CLASS_ATTR_RE.sub("", df_html)
         return df_html
 
     def _postprocess_html(self, code: str) -> str:
@@ -79,7 +88,7 @@ class ExecutionResult(BaseModel):
     def _to_html(self, *, plot_mimebundle: dict[str, Any] | None = None) -> str:
         import html
 
-        modality_hints = self.meta.get(OutputModalityHints.META_KEY, OutputModalityHints())
+        modality_hints = self.meta.get(OutputModalityHints.META_KEY, DEFAULT_OUTPUT_MODALITY_HINTS)
         html_parts = {}
 
         text_html = f"<pre>{html.escape(self.text.strip())}</pre>"  # TODO markdown to HTML
@@ -1,10 +1,11 @@
+import threading
 import uuid
 from typing import TYPE_CHECKING, Any
 
 from pandas import DataFrame
 from typing_extensions import Self
 
-from databao.core.executor import ExecutionResult, OutputModalityHints
+from databao.core.executor import DEFAULT_OUTPUT_MODALITY_HINTS, ExecutionResult, OutputModalityHints
 from databao.core.opa import Opa
 
 if TYPE_CHECKING:
@@ -61,42 +62,49 @@ class Thread:
 
         # A unique cache scope so executors can store per-thread state (e.g., message history)
         self._cache_scope = f"{self._agent.name}/{uuid.uuid4()}"
+        self._cache = self._agent.cache.scoped(self._cache_scope)
+
+        # Guards opas and results for ask/drop/materialization. Reentrant: materializing a visualization
+        # materializes data, and auto output modality may plot.
+        self._materialize_lock = threading.RLock()
 
     def _materialize_data(self, rows_limit: int | None) -> "ExecutionResult":
         """Materialize the latest data state by executing pending OPAs if needed."""
-        new_opas = self._opas[self._opas_processed_count :]
-        if len(new_opas) > 0:
-            rows_limit = rows_limit if rows_limit else self._default_rows_limit
-            stream = self._stream_ask if self._stream_ask is not None else self._default_stream_ask
-            for opa in new_opas:
-                self._data_result = self._agent.executor.execute(
-                    opa,
-                    cache=self._agent.cache.scoped(self._cache_scope),
-                    llm_config=self._agent.llm_config,
-                    sources=self._agent.sources,
-                    rows_limit=rows_limit,
-                    stream=stream,
-                )
-                self._meta.update(self._data_result.meta)
-            self._opas_processed_count += len(new_opas)
-            self._data_materialized_rows = rows_limit
-        if self._data_result is None:
-            raise RuntimeError("_data_result is None after materialization")
-        return self._data_result
+        with self._materialize_lock:
+            new_opas = self._opas[self._opas_processed_count :]
+            if len(new_opas) > 0:
+                rows_limit = rows_limit if rows_limit else self._default_rows_limit
+                stream = self._stream_ask if self._stream_ask is not None else self._default_stream_ask
+                for opa in new_opas:
+                    self._data_result = self._agent.executor.execute(
+                        opa,
+                        cache=self._cache,
+                        llm_config=self._agent.llm_config,
+                        sources=self._agent.sources,
+                        rows_limit=rows_limit,
+                        stream=stream,
+                    )
+                    self._meta.update(self._data_result.meta)
+                self._opas_processed_count += len(new_opas)
+                self._data_materialized_rows = rows_limit
+            if self._data_result is None:
+                raise RuntimeError("_data_result is None after materialization")
+            return self._data_result
 
     def _materialize_visualization(self, request: str | None, rows_limit: int | None) -> "VisualisationResult":
         """Materialize latest visualization for the given request and current data."""
-        data = self._materialize_data(rows_limit)
-        if self._visualization_result is None or request != self._visualization_request:
-            # TODO Cache visualization results as in Executor.execute()?
-            stream = self._stream_plot if self._stream_plot is not None else self._default_stream_plot
-            self._visualization_result = self._agent.visualizer.visualize(request, data, stream=stream)
-            self._visualization_request = request
-            self._meta.update(self._visualization_result.meta)
-            self._meta["plot_code"] = self._visualization_result.code  # maybe worth to expand as a property later
-        if self._visualization_result is None:
-            raise RuntimeError("_visualization_result is None after materialization")
-        return self._visualization_result
+        with self._materialize_lock:
+            data = self._materialize_data(rows_limit)
+            if self._visualization_result is None or request != self._visualization_request:
+                # TODO Cache visualization results as in Executor.execute()?
+                stream = self._stream_plot if self._stream_plot is not None else self._default_stream_plot
+                self._visualization_result = self._agent.visualizer.visualize(request, data, stream=stream)
+                self._visualization_request = request
+                self._meta.update(self._visualization_result.meta)
+                self._meta["plot_code"] = self._visualization_result.code  # maybe worth to expand as a property later
+            if self._visualization_result is None:
+                raise RuntimeError("_visualization_result is None after materialization")
+            return self._visualization_result
 
     def _materialize(self, rows_limit: int | None) -> None:
         data_result = self._materialize_data(rows_limit)
@@ -105,7 +113,7 @@ class Thread:
             return
 
         # The Executor can provide output modality hints
-        hints = data_result.meta.get(OutputModalityHints.META_KEY, OutputModalityHints())
+        hints = data_result.meta.get(OutputModalityHints.META_KEY, DEFAULT_OUTPUT_MODALITY_HINTS)
         if not hints.should_visualize:
             return
 
@@ -154,21 +162,23 @@ class Thread:
 
         Setting rows_limit has no effect in lazy mode.
         """
-        # NB. A new Opa is created even if it's identical to the previous one.
-        if self._opas_processed_count < len(self._opas):
-            assert self._lazy_mode
-            self._opas[-1].append(Opa(query=query))
-        else:
-            # Add new Opa group
-            self._opas.append([Opa(query=query)])
-
-        # Invalidate old results so they are not used by repr methods
-        self._data_result = None
-        self._visualization_result = None
-
-        # If multiple .asks are chained, the last setting takes precedence.
-        # Tracking the stream setting for each ask in a chain would not work with "opa-collocation".
-        self._stream_ask = stream
+        # Under the lock, so a concurrent materialization never sees half-updated opas or results
+        with self._materialize_lock:
+            # NB. A new Opa is created even if it's identical to the previous one.
+            if self._opas_processed_count < len(self._opas):
+                assert self._lazy_mode
+                self._opas[-1].append(Opa(query=query))
+            else:
+                # Add new Opa group
+                self._opas.append([Opa(query=query)])
+
+            # Invalidate old results so they are not used by repr methods
+            self._data_result = None
+            self._visualization_result = None
+
+            # If multiple .asks are chained, the last setting takes precedence.
+            # Tracking the stream setting for each ask in a chain would not work with "opa-collocation".
+            self._stream_ask = stream
 
         if not self._lazy_mode:
             self._materialize(rows_limit)
@@ -177,28 +187,29 @@ class Thread:
 
     def drop(self, n: int = 1) -> None:
         """Remove N last user queries from this thread along with the answer it produced."""
-        sum_, n_groups = 0, 0
-        for group in reversed(self._opas):
-            sum_ += len(group)
-            n_groups += 1
-            if sum_ >= n:
-                break
-
-        n_materialized_group = n_groups - (len(self._opas) - self._opas_processed_count)
-
-        # We need to drop `n` individual opas, combined into `n_groups` groups,
-        # `n_materialized_group` of which are materialized.
-        if sum_ == n:
-            # Full drop of groups
-            self._opas = self._opas[:-n_groups]
-        else:
-            full_groups = n_groups - 1
-            if full_groups > 0:
-                self._opas = self._opas[:-full_groups]
-            self._opas[-1] = self._opas[-1][: -(sum_ - n)]
-
-        self._agent.executor.drop_last_opa_group(self._agent.cache.scoped(self._cache_scope), n=n_materialized_group)
-        self._opas_processed_count -= n_materialized_group
+        with self._materialize_lock:
+            sum_, n_groups = 0, 0
+            for group in reversed(self._opas):
+                sum_ += len(group)
+                n_groups += 1
+                if sum_ >= n:
+                    break
+
+            n_materialized_group = n_groups - (len(self._opas) - self._opas_processed_count)
+
+            # We need to drop `n` individual opas, combined into `n_groups` groups,
+            # `n_materialized_group` of which are materialized.
+            if sum_ == n:
+                # Full drop of groups
+                self._opas = self._opas[:-n_groups]
+            else:
+                full_groups = n_groups - 1
+                if full_groups > 0:
+                    self._opas = self._opas[:-full_groups]
+                self._opas[-1] = self._opas[-1][: -(sum_ - n)]
+
+            self._agent.executor.drop_last_opa_group(self._cache, n=n_materialized_group)
+            self._opas_processed_count -= n_materialized_group
 
         if self._opas:
             print(
@@ -236,7 +247,7 @@ class Thread:
         # If None is returned, IPython will fall back to repr()
         if self._data_result is None:
             return None
-        modality_hints = self._data_result.meta.get(OutputModalityHints.META_KEY, OutputModalityHints())
+        modality_hints = self._data_result.meta.get(OutputModalityHints.META_KEY, DEFAULT_OUTPUT_MODALITY_HINTS)
         plot_bundle: dict[str, Any] | None = None
         if modality_hints.should_visualize and self._visualization_result is not None:
             plot_bundle = self._visualization_result._repr_mimebundle_(include, exclude)
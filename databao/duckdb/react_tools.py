@@ -1,13 +1,16 @@
+import csv
+import io
 import json
 from typing import Any
 
 import pandas as pd
 from duckdb import DuckDBPyConnection
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
 from langchain_core.tools import tool
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import create_react_agent
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, ValidationError
 
 from databao.duckdb.utils import describe_duckdb_schema
 
@@ -18,6 +21,8 @@ class AgentResponse(BaseModel):
     sql: str
     explanation: str
 
+    model_config = ConfigDict(frozen=True)
+
 
 def execute_duckdb_sql(sql: str, con: DuckDBPyConnection, *, limit: int | None = None) -> pd.DataFrame:
     # Use duckdb's Relation API to inject a LIMIT clause
@@ -33,6 +38,20 @@ def execute_duckdb_sql(sql: str, con: DuckDBPyConnection, *, limit: int | None =
     return rel.df()  # Execute and return DataFrame
 
 
+def _preview_duckdb_sql(sql: str, con: DuckDBPyConnection, *, limit: int | None) -> tuple[list[str], str]:
+    """Run the query and return its column names and the first rows as CSV, without going through pandas."""
+    rel = con.sql(sql)
+    if rel is None:
+        return [], ""
+    if limit is not None:
+        rel = rel.limit(limit)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(rel.columns)
+    writer.writerows(rel.fetchall())
+    return rel.columns, buffer.getvalue()
+
+
 def make_duckdb_tool(con: DuckDBPyConnection) -> Any:
     """
     Create a DuckDB SQL execution tool for LangChain executors.
@@ -57,10 +76,10 @@ def make_duckdb_tool(con: DuckDBPyConnection) -> Any:
             JSON string: { "columns": [...], "rows": str, "limit": int, "note": str }
         """
         try:
-            df = execute_duckdb_sql(sql, con, limit=limit)
+            columns, rows = _preview_duckdb_sql(sql, con, limit=limit)
             payload = {
-                "columns": list(df.columns),
-                "rows": df.to_string(index=False),
+                "columns": columns,
+                "rows": rows,
                 "limit": limit,
                 "note": "Query executed successfully",
             }
@@ -77,6 +96,56 @@ def make_duckdb_tool(con: DuckDBPyConnection) -> Any:
     return execute_sql
 
 
+def make_submit_answer_tool() -> Any:
+    """
+    Create the tool the ReAct agent calls to hand its final answer back.
+
+    The tool returns directly, so the agent run ends with the answer in the tool call arguments instead of spending
+    another LLM call on structured output.
+    """
+
+    @tool("submit_answer", args_schema=AgentResponse, return_direct=True)
+    def submit_answer(sql: str, explanation: str) -> str:
+        """Submit the final SQL query and a concise explanation to the user. This must be the last tool call."""
+        return "Answer submitted."
+
+    return submit_answer
+
+
+def get_submitted_answer(messages: list[BaseMessage]) -> AgentResponse | None:
+    """Return the answer from the last AI message's `submit_answer` call, or None if it was not called or failed."""
+    tool_messages: dict[str, ToolMessage] = {}
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            tool_messages[message.tool_call_id] = message
+        elif isinstance(message, AIMessage):
+            for tool_call in message.tool_calls:
+                if tool_call["name"] != "submit_answer":
+                    continue
+                tool_message = tool_messages.get(tool_call["id"] or "")
+                if tool_message is not None and tool_message.status == "error":
+                    return None
+                try:
+                    return AgentResponse.model_validate(tool_call["args"])
+                except ValidationError:
+                    return None
+            return None
+    return None
+
+
+def is_failed_submission(messages: list[BaseMessage]) -> bool:
+    """Whether the run ended on a rejected `submit_answer` call (e.g. with invalid arguments).
+
+    `submit_answer` returns directly, so the agent stops even when the call fails and must be resumed to retry.
+    """
+    last_message = messages[-1] if messages else None
+    return (
+        isinstance(last_message, ToolMessage)
+        and last_message.name == "submit_answer"
+        and last_message.status == "error"
+    )
+
+
 def make_react_duckdb_agent(con: DuckDBPyConnection, llm: BaseChatModel) -> CompiledStateGraph[Any]:
     """
     Create a ReAct agent configured to work with DuckDB.
@@ -97,9 +166,8 @@ def make_react_duckdb_agent(con: DuckDBPyConnection, llm: BaseChatModel) -> Comp
     - Translate the NL question to ONE DuckDB SQL statement.
     - Use provided schema.
     - You can fetch extra details about schema/tables/columns if needed using SQL queries.
-    - After running, write a concise, user-friendly explanation.
+    - When done, call `submit_answer` with the exact SQL you ran and a concise, user-friendly explanation.
     - Do NOT write any tables/lists to the output.
-    - Always include the exact SQL you ran.
     - Always use the full table name in query with db name and schema name.
 
     Available schema:
@@ -107,11 +175,10 @@ def make_react_duckdb_agent(con: DuckDBPyConnection, llm: BaseChatModel) -> Comp
     """
     # LangGraph prebuilt ReAct agent
     execute_sql_tool = make_duckdb_tool(con)
-    tools = [execute_sql_tool]
+    tools = [execute_sql_tool, make_submit_answer_tool()]
     agent = create_react_agent(
         llm,
         tools=tools,
         prompt=SYSTEM_PROMPT,
-        response_format=AgentResponse,
     )
     return agent
@@ -1,10 +1,16 @@
+import itertools
 import re
+import weakref
 from typing import Any
 from urllib.parse import quote, urlsplit, urlunsplit
 
 from duckdb import DuckDBPyConnection
 from sqlalchemy import URL, Engine
 
+# Extensions already installed and loaded per connection, so that attaching several sources of the same kind
+# only runs INSTALL/LOAD once.
+_loaded_extensions: "weakref.WeakKeyDictionary[DuckDBPyConnection, set[str]]" = weakref.WeakKeyDictionary()
+
 
 def get_db_path(conn: Any) -> str | None:
     """Get the database file path for DuckDB connection, or None if in-memory."""
@@ -25,25 +31,21 @@ def describe_duckdb_schema(con: DuckDBPyConnection, max_cols_per_table: int = 40
         max_cols_per_table: Truncate column lists longer than this.
     """
     rows = con.execute("""
-                        SELECT table_catalog, table_schema, table_name
-                        FROM information_schema.tables
-                        WHERE table_type IN ('BASE TABLE', 'VIEW')
-                            AND table_schema NOT IN ('pg_catalog', 'pg_toast', 'information_schema')
-                        ORDER BY table_schema, table_name
+                        SELECT t.table_catalog, t.table_schema, t.table_name, c.column_name, c.data_type
+                        FROM information_schema.tables t
+                        LEFT JOIN information_schema.columns c
+                            ON c.table_catalog = t.table_catalog
+                                AND c.table_schema = t.table_schema
+                                AND c.table_name = t.table_name
+                        WHERE t.table_type IN ('BASE TABLE', 'VIEW')
+                            AND t.table_schema NOT IN ('pg_catalog', 'pg_toast', 'information_schema')
+                        ORDER BY t.table_schema, t.table_name, t.table_catalog, c.ordinal_position
                         """).fetchall()
 
+    # All columns are fetched in a single query and grouped per table here.
     lines: list[str] = []
-    for db, schema, table in rows:
-        cols = con.execute(
-            """
-                            SELECT column_name, data_type
-                            FROM information_schema.columns
-                            WHERE table_schema = ?
-                                AND table_name = ?
-                            ORDER BY ordinal_position
-                            """,
-            [schema, table],
-        ).fetchall()
+    for (db, schema, table), table_rows in itertools.groupby(rows, key=lambda row: row[:3]):
+        cols = [(c, t) for *_, c, t in table_rows if c is not None]
         if len(cols) > max_cols_per_table:
             cols = cols[:max_cols_per_table]
             suffix = " ... (truncated)"
@@ -61,25 +63,43 @@ def register_sqlalchemy(con: DuckDBPyConnection, sqlalchemy_engine: Engine, name
     database becomes available under the given `name` within the DuckDB connection.
     """
     sa_url = sqlalchemy_engine.url.render_as_string(hide_password=False)
-    dialect = getattr(getattr(sqlalchemy_engine, "dialect", None), "name", "")
+    dialect = sqlalchemy_engine.dialect.name
     if dialect.startswith("postgres"):
-        con.execute("INSTALL postgres;")
-        con.execute("LOAD postgres;")
-        pg_url = sqlalchemy_to_postgres_url(sqlalchemy_engine.url)
-        con.execute(f"ATTACH '{pg_url}' AS {name} (TYPE POSTGRES);")
+        extension = "postgres"
+        attach_url = sqlalchemy_to_postgres_url(sqlalchemy_engine.url)
     elif dialect.startswith(("mysql", "mariadb")):
-        con.execute("INSTALL mysql;")
-        con.execute("LOAD mysql;")
-        mysql_url = sqlalchemy_to_duckdb_mysql(sa_url)
-        con.execute(f"ATTACH '{mysql_url}' AS {name} (TYPE MYSQL);")
+        extension = "mysql"
+        attach_url = sqlalchemy_to_duckdb_mysql(sa_url)
     elif dialect.startswith("sqlite"):
-        con.execute("INSTALL sqlite;")
-        con.execute("LOAD sqlite;")
-        sqlite_path = re.sub("^sqlite:///", "", sa_url)
-        con.execute(f"ATTACH '{sqlite_path}' AS {name} (TYPE SQLITE);")
+        extension = "sqlite"
+        attach_url = sa_url.removeprefix("sqlite:///")
     else:
         raise ValueError(f"Database engine '{dialect}' is not supported yet")
 
+    attach_sql = make_attach_sql(attach_url, name, f"TYPE {extension.upper()}")
+    loaded = _loaded_extensions.setdefault(con, set())
+    setup_sql = "" if extension in loaded else f"INSTALL {extension}; LOAD {extension}; "
+    # Submit all statements in a single call, DuckDB executes them in order.
+    con.execute(f"{setup_sql}{attach_sql};")
+    loaded.add(extension)
+
+
+def make_attach_sql(path: str, name: str, *options: str) -> str:
+    """Build an ATTACH statement for a database path or connection string.
+
+    DuckDB does not accept prepared parameters in ATTACH, so the path is escaped as a string literal
+    and the name is quoted as an identifier instead.
+
+    Args:
+        path: Database file path or connection string.
+        name: Name of the attached database within DuckDB.
+        options: Attach options, e.g. "READ_ONLY" or "TYPE POSTGRES".
+    """
+    quoted_path = "'" + path.replace("'", "''") + "'"
+    quoted_name = '"' + name.replace('"', '""') + '"'
+    options_sql = f" ({', '.join(options)})" if options else ""
+    return f"ATTACH {quoted_path} AS {quoted_name}{options_sql}"
+
 
 def sqlalchemy_to_postgres_url(url: URL) -> str:
     """Convert SQLAlchemy-style PostgreSQL URL to a PostgreSQL URI."""
@@ -90,6 +110,9 @@ def sqlalchemy_to_postgres_url(url: URL) -> str:
     return new_url.render_as_string(hide_password=False)
 
 
+_MYSQL_SCHEME_RE = re.compile(r"^mysql(?:\+[^:/]*)?://")
+
+
 def sqlalchemy_to_duckdb_mysql(sa_url: str, keep_query: bool = True) -> str:
     """
     Convert SQLAlchemy-style MySQL URL to DuckDB MySQL extension URI.
@@ -100,10 +123,10 @@ def sqlalchemy_to_duckdb_mysql(sa_url: str, keep_query: bool = True) -> str:
     """
     # 1) Strip the SQLAlchemy driver (+pymysql, +mysqldb, etc.)
     #    Accept both 'mysql://' and 'mysql+driver://'
-    if sa_url.startswith("mysql+"):
-        sa_url = "mysql://" + sa_url.split("://", 1)[1]
-    elif not sa_url.startswith("mysql://"):
+    scheme = _MYSQL_SCHEME_RE.match(sa_url)
+    if scheme is None:
         raise ValueError("Expected a MySQL URL starting with 'mysql://' or 'mysql+...'")
+    sa_url = "mysql://" + sa_url[scheme.end() :]
 
     # 2) Parse
     parts = urlsplit(sa_url)
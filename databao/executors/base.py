@@ -29,9 +29,9 @@ class GraphExecutor(Executor, ABC):
         Returns:
             All messages including the new one
         """
-        messages: list[Any] = cache.get("state", {}).get("messages", [])
         query = "\n\n".join(opa.query for opa in opas)
-        messages.append(HumanMessage(content=query))
+        # Build a new list: the cache may hand out its stored list, which is only ever replaced via cache.put.
+        messages: list[Any] = [*cache.get("state", {}).get("messages", []), HumanMessage(content=query)]
         return messages
 
     def _update_message_history(self, cache: Cache, final_messages: list[Any]) -> None:
@@ -39,6 +39,20 @@ class GraphExecutor(Executor, ABC):
         if final_messages:
             cache.put("state", {"messages": final_messages})
 
+    def drop_last_opa_group(self, cache: Cache, n: int = 1) -> None:
+        """Drop last n groups of operations from the message history."""
+        # Work on a copy and put it back, the stored list is never changed in place (see _process_opas).
+        messages = list(cache.get("state", default={}).get("messages", []))
+        human_messages = [m for m in messages if isinstance(m, HumanMessage)]
+        if len(human_messages) < n:
+            raise ValueError(f"Cannot drop last {n} operations - only {len(human_messages)} operations found.")
+        c = 0
+        while c < n:
+            m = messages.pop()
+            if isinstance(m, HumanMessage):
+                c += 1
+        cache.put("state", {"messages": messages})
+
     def _make_output_modality_hints(self, result: ExecutionResult) -> OutputModalityHints:
         # A separate LLM module could be used to fill out the hints
         vis_prompt = result.meta.get("visualization_prompt", None)
@@ -6,6 +6,9 @@ from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, Base
 
 from databao.executors.frontend.messages import get_reasoning_content, get_tool_call, get_tool_call_sql
 
+_CURRENCY_DOLLAR_RE = re.compile(r"\$(\d+)")
+_STRIKETHROUGH_RE = re.compile(r"~(.?\d+)")
+
 
 class TextStreamFrontend:
     """Helper for streaming LangGraph LLM outputs to a text stream (stdout, stderr, a file, etc.)."""
@@ -117,12 +120,12 @@ class TextStreamFrontend:
 
 def escape_currency_dollar_signs(text: str) -> str:
     """Escapes dollar signs in a string to prevent MathJax interpretation in markdown environments."""
-    return re.sub(r"\$(\d+)", r"\$\1", text)
+    return _CURRENCY_DOLLAR_RE.sub(r"\$\1", text)
 
 
 def escape_strikethrough(text: str) -> str:
     """Prevents aggressive markdown strikethrough formatting."""
-    return re.sub(r"~(.?\d+)", r"\~\1", text)
+    return _STRIKETHROUGH_RE.sub(r"\~\1", text)
 
 
 def escape_markdown_text(text: str) -> str:
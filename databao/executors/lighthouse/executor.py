@@ -1,8 +1,9 @@
+import time
 from pathlib import Path
 from typing import Any
 
 import duckdb
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph.state import CompiledStateGraph
 from sqlalchemy import Connection, Engine
@@ -11,7 +12,7 @@ from databao.configs import LLMConfig
 from databao.core import Cache, ExecutionResult, Opa
 from databao.core.data_source import DBDataSource, DFDataSource, Sources
 from databao.core.executor import OutputModalityHints
-from databao.duckdb.utils import describe_duckdb_schema, get_db_path, register_sqlalchemy
+from databao.duckdb.utils import describe_duckdb_schema, get_db_path, make_attach_sql, register_sqlalchemy
 from databao.executors.base import GraphExecutor
 from databao.executors.lighthouse.graph import ExecuteSubmit
 from databao.executors.lighthouse.history_cleaning import clean_tool_history
@@ -19,15 +20,21 @@ from databao.executors.lighthouse.utils import get_today_date_str, read_prompt_t
 
 
 class LighthouseExecutor(GraphExecutor):
+    SCHEMA_CACHE_TTL_SECONDS = 600.0
+    """How long a schema description is reused before the catalog is queried again."""
+
     def __init__(self) -> None:
         super().__init__()
-        self._prompt_template = read_prompt_template(Path("system_prompt.jinja"))
 
         # Create a DuckDB connection for the agent
         self._duckdb_connection = duckdb.connect(":memory:")
         self._graph: ExecuteSubmit = ExecuteSubmit(self._duckdb_connection)
         self._compiled_graph: CompiledStateGraph[Any] | None = None
 
+        # (time of description, graph's schema_change_count, description) of the last described schema of
+        # self._duckdb_connection
+        self._schema_cache: tuple[float, int, str] | None = None
+
     def render_system_prompt(
         self,
         data_connection: Any,
@@ -35,7 +42,10 @@ class LighthouseExecutor(GraphExecutor):
         recursion_limit: int = 50,
     ) -> str:
         """Render system prompt with database schema."""
-        db_schema = describe_duckdb_schema(data_connection)
+        if data_connection is self._duckdb_connection:
+            db_schema = self._describe_schema()
+        else:
+            db_schema = describe_duckdb_schema(data_connection)
 
         context = ""
         for db_name, source in sources.dbs.items():
@@ -50,14 +60,36 @@ class LighthouseExecutor(GraphExecutor):
             context += f"## General information {idx}\n\n{add_ctx.strip()}\n\n"
         context = context.strip()
 
-        prompt = self._prompt_template.render(
+        # Loaded on first render rather than at construction; read_prompt_template caches the parsed template.
+        prompt_template = read_prompt_template(Path("system_prompt.jinja"))
+        prompt = prompt_template.render(
             date=get_today_date_str(), db_schema=db_schema, context=context, tool_limit=recursion_limit // 2
         )
 
         return prompt.strip()
 
+    def _describe_schema(self) -> str:
+        """Describe the schema of the agent's connection, reusing a recent description.
+
+        The system prompt is rendered on every question, but the schema only changes when sources are registered
+        (which clears the cache), when the agent runs a statement that is not a query (tracked by the graph),
+        or when attached databases change externally (picked up after the TTL).
+        """
+        now = time.monotonic()
+        if self._schema_cache is not None:
+            described_at, schema_change_count, db_schema = self._schema_cache
+            if (
+                schema_change_count == self._graph.schema_change_count
+                and now - described_at < self.SCHEMA_CACHE_TTL_SECONDS
+            ):
+                return db_schema
+        db_schema = describe_duckdb_schema(self._duckdb_connection)
+        self._schema_cache = (now, self._graph.schema_change_count, db_schema)
+        return db_schema
+
     def register_db(self, source: DBDataSource) -> None:
         """Register DB in the DuckDB connection."""
+        self._schema_cache = None
         connection = source.db_connection
         if isinstance(connection, Connection):
             connection = connection.engine
@@ -66,7 +98,7 @@ class LighthouseExecutor(GraphExecutor):
             path = get_db_path(connection)
             if path is not None:
                 connection.close()
-                self._duckdb_connection.execute(f"ATTACH '{path}' AS {source.name} (READ_ONLY)")
+                self._duckdb_connection.execute(make_attach_sql(path, source.name, "READ_ONLY"))
             else:
                 raise RuntimeError("Memory-based DuckDB is not supported.")
         elif isinstance(connection, Engine):
@@ -75,6 +107,7 @@ class LighthouseExecutor(GraphExecutor):
             raise ValueError("Only DuckDB or SQLAlchemy connections are supported.")
 
     def register_df(self, source: DFDataSource) -> None:
+        self._schema_cache = None
         self._duckdb_connection.register(source.name, source.df)
 
     def _get_compiled_graph(self, llm_config: LLMConfig) -> CompiledStateGraph[Any]:
@@ -84,18 +117,6 @@ class LighthouseExecutor(GraphExecutor):
 
         return compiled_graph
 
-    def drop_last_opa_group(self, cache: Cache, n: int = 1) -> None:
-        """Drop last n groups of operations from the message history."""
-        messages = cache.get("state", default={}).get("messages", [])
-        human_messages = [m for m in messages if isinstance(m, HumanMessage)]
-        if len(human_messages) < n:
-            raise ValueError(f"Cannot drop last {n} operations - only {len(human_messages)} operations found.")
-        c = 0
-        while c < n:
-            m = messages.pop()
-            if isinstance(m, HumanMessage):
-                c += 1
-
     def execute(
         self,
         opas: list[Opa],
@@ -130,7 +151,8 @@ class LighthouseExecutor(GraphExecutor):
         if final_messages:
             new_messages = final_messages[len(cleaned_messages) :]
             all_messages = all_messages_with_system + new_messages
-            all_messages_without_system = [msg for msg in all_messages if msg.type != "system"]
+            # The system message is only ever the first one, so strip it without scanning the whole history.
+            all_messages_without_system = all_messages[1 if all_messages[0].type == "system" else 0 :]
             if execution_result.meta.get("messages"):
                 execution_result.meta["messages"] = all_messages
             self._update_message_history(cache, all_messages_without_system)
@@ -17,7 +17,6 @@ from typing_extensions import TypedDict
 from databao.configs.llm import LLMConfig
 from databao.core import ExecutionResult
 from databao.duckdb.react_tools import execute_duckdb_sql
-from databao.executors.frontend.text_frontend import dataframe_to_markdown
 from databao.executors.lighthouse.utils import exception_to_string
 
 
@@ -39,6 +38,21 @@ def get_query_ids_mapping(messages: list[BaseMessage]) -> dict[str, ToolMessage]
     return query_ids
 
 
+def should_continue(state: AgentState) -> Literal["tool_executor", "end"]:
+    # Check if there are tool calls in the last message
+    last_message = state["messages"][-1]
+    if isinstance(last_message, AIMessage) and last_message.tool_calls:
+        return "tool_executor"
+    return "end"
+
+
+def should_finish(state: AgentState) -> Literal["llm_node", "end"]:
+    # Check if we just executed submit_result - if so, end the conversation
+    if state.get("ready_for_user", False):
+        return "end"
+    return "llm_node"
+
+
 class ExecuteSubmit:
     """Simple graph with two tools: run_sql_query and submit_result.
     All context must be in the SystemMessage."""
@@ -48,6 +62,13 @@ class ExecuteSubmit:
 
     def __init__(self, connection: DuckDBPyConnection):
         self._connection = connection
+        self._schema_change_count = 0
+
+    @property
+    def schema_change_count(self) -> int:
+        """Number of statements run by the SQL tool that were not queries (e.g. CREATE TABLE) and may have changed
+        the schema."""
+        return self._schema_change_count
 
     def init_state(self, messages: list[BaseMessage], *, limit_max_rows: int | None = None) -> AgentState:
         return AgentState(
@@ -68,44 +89,31 @@ class ExecuteSubmit:
                 break
         if last_ai_message is None:
             raise RuntimeError("No AI message found in message log")
-        if len(last_ai_message.tool_calls) == 0:
-            # Sometimes models don't call the submit_result tool, but we still want to return some dataframe.
-            sql = state.get("sql", "")
-            df = state.get("df")  # Latest df result (usually from run_sql_query)
-            visualization_prompt = state.get("visualization_prompt")
-            result = ExecutionResult(
-                text=last_ai_message.text,
-                df=df,
-                code=sql,
-                meta={
-                    "visualization_prompt": visualization_prompt,
-                    "messages": state["messages"],
-                    "submit_called": False,
-                },
-            )
-        elif len(last_ai_message.tool_calls) > 1:
+        tool_calls = last_ai_message.tool_calls
+        if len(tool_calls) > 1:
             raise RuntimeError("Expected exactly one tool call in AI message")
-        elif last_ai_message.tool_calls[0]["name"] != "submit_result":
-            raise RuntimeError(
-                f"Expected submit_result tool call in AI message, got {last_ai_message.tool_calls[0]['name']}"
-            )
-        else:
-            sql = state.get("sql", "")
-            df = state.get("df")
-            tool_call = last_ai_message.tool_calls[0]
-            text = tool_call["args"]["result_description"]
+        submit_called = len(tool_calls) == 1
+        if submit_called and tool_calls[0]["name"] != "submit_result":
+            raise RuntimeError(f"Expected submit_result tool call in AI message, got {tool_calls[0]['name']}")
+
+        if submit_called:
+            text = tool_calls[0]["args"]["result_description"]
             visualization_prompt = state.get("visualization_prompt", "")
-            result = ExecutionResult(
-                text=text,
-                df=df,
-                code=sql,
-                meta={
-                    "visualization_prompt": visualization_prompt,
-                    "messages": state["messages"],
-                    "submit_called": True,
-                },
-            )
-        return result
+        else:
+            # Sometimes models don't call the submit_result tool, but we still want to return some dataframe
+            # (the latest df result, usually from run_sql_query).
+            text = last_ai_message.text
+            visualization_prompt = state.get("visualization_prompt")
+        return ExecutionResult(
+            text=text,
+            df=state.get("df"),
+            code=state.get("sql", ""),
+            meta={
+                "visualization_prompt": visualization_prompt,
+                "messages": state["messages"],
+                "submit_called": submit_called,
+            },
+        )
 
     def make_tools(self) -> list[BaseTool]:
         @tool(parse_docstring=True)
@@ -120,12 +128,13 @@ class ExecuteSubmit:
                 # TODO use ToolRuntime in LangChain v1.0
                 limit = graph_state["limit_max_rows"]
                 df = execute_duckdb_sql(sql, self._connection, limit=limit)
+                # Only statements that are not queries (DDL, DML) produce a result without columns
+                if len(df.columns) == 0:
+                    self._schema_change_count += 1
                 df_csv = df.head(self.MAX_TOOL_ROWS).to_csv(index=False)
-                df_markdown = dataframe_to_markdown(df.head(self.MAX_TOOL_ROWS), index=False)
                 if len(df) > self.MAX_TOOL_ROWS:
                     df_csv += f"\nResult is truncated from {len(df)} to {self.MAX_TOOL_ROWS} rows."
-                    df_markdown += f"\nResult is truncated from {len(df)} to {self.MAX_TOOL_ROWS} rows."
-                return {"df": df, "sql": sql, "csv": df_csv, "markdown": df_markdown}
+                return {"df": df, "sql": sql, "csv": df_csv}
             except Exception as e:
                 return {"error": exception_to_string(e)}
 
@@ -154,16 +163,33 @@ class ExecuteSubmit:
 
     def compile(self, model_config: LLMConfig) -> CompiledStateGraph[Any]:
         tools = self.make_tools()
-        llm_model = model_config.new_chat_model()
+        tool_by_name = {t.name: t for t in tools}
+        llm_model = model_config.chat_model()
 
         model_with_tools = self._model_bind_tools(
             llm_model, tools, parallel_tool_calls=model_config.parallel_tool_calls
         )
 
+        # Decide once per compiled graph instead of on every LLM call.
+        use_prompt_caching = model_config.cache_system_prompt and self._is_anthropic_model(model_config)
+        model_with_retry = model_with_tools.with_retry(wait_exponential_jitter=True, stop_after_attempt=3)
+
+        # The system message is the same object on every step of a run, so its cached copy is reused.
+        cached_system_message: tuple[BaseMessage, BaseMessage] | None = None
+
         def llm_node(state: AgentState) -> dict[str, Any]:
+            nonlocal cached_system_message
             messages = state["messages"]
-            response = self._chat(messages, model_config, model_with_tools)
-            return {"messages": [response[-1]]}
+            if use_prompt_caching and messages and messages[0].type == "system":
+                # Read once: the compiled graph is shared, so another run may replace the cached pair concurrently
+                cached = cached_system_message
+                if cached is None or cached[0] is not messages[0]:
+                    messages = self._apply_system_prompt_caching(model_config, messages)
+                    cached_system_message = (state["messages"][0], messages[0])
+                else:
+                    messages = [cached[1], *messages[1:]]
+            response = model_with_retry.invoke(messages)
+            return {"messages": [response]}
 
         def tool_executor_node(state: AgentState) -> dict[str, Any]:
             last_message = state["messages"][-1]
@@ -207,7 +233,7 @@ class ExecuteSubmit:
                         ]
                         return {"messages": tool_messages, "ready_for_user": False}
 
-            query_ids = dict(state.get("query_ids", {}))
+            new_query_ids: dict[str, ToolMessage] = {}
             sql = state.get("sql")
             df = state.get("df")
             visualization_prompt = state.get("visualization_prompt", "")
@@ -218,8 +244,7 @@ class ExecuteSubmit:
                 name = tool_call["name"]
                 args = tool_call["args"]
                 tool_call_id = tool_call["id"]
-                # Find the tool by name
-                tool = next((t for t in tools if t.name == name), None)
+                tool = tool_by_name.get(name)
                 if tool is None:
                     tool_messages.append(ToolMessage(content=f"Tool {name} does not exist!", tool_call_id=tool_call_id))
                     continue
@@ -241,7 +266,7 @@ class ExecuteSubmit:
                     if "csv" in result:
                         content = f"query_id='{query_id}'\n\n{content}"
                     if query_id:
-                        query_ids[query_id] = ToolMessage(
+                        new_query_ids[query_id] = ToolMessage(
                             content=content,
                             tool_call_id=tool_call_id,
                             artifact=result,
@@ -261,6 +286,10 @@ class ExecuteSubmit:
                         "visualization_prompt": visualization_prompt,
                         "ready_for_user": True,
                     }
+            # Copy the mapping only if this step actually added queries to it
+            query_ids = state.get("query_ids", {})
+            if new_query_ids:
+                query_ids = query_ids | new_query_ids
             return {
                 "messages": tool_messages,
                 "query_ids": query_ids,
@@ -270,19 +299,6 @@ class ExecuteSubmit:
                 "ready_for_user": False,
             }
 
-        def should_continue(state: AgentState) -> Literal["tool_executor", "end"]:
-            # Check if there are tool calls in the last message
-            last_message = state["messages"][-1]
-            if isinstance(last_message, AIMessage) and last_message.tool_calls:
-                return "tool_executor"
-            return "end"
-
-        def should_finish(state: AgentState) -> Literal["llm_node", "end"]:
-            # Check if we just executed submit_result - if so, end the conversation
-            if state.get("ready_for_user", False):
-                return "end"
-            return "llm_node"
-
         graph = StateGraph(AgentState)
         graph.add_node("llm_node", llm_node)
         graph.add_node("tool_executor", tool_executor_node)
@@ -301,18 +317,6 @@ class ExecuteSubmit:
         else:
             return model.bind_tools(tools, **kwargs)
 
-    @staticmethod
-    def _chat(
-        messages: list[BaseMessage],
-        config: LLMConfig,
-        model: Runnable[list[BaseMessage], Any] | None = None,
-    ) -> list[BaseMessage]:
-        if model is None:
-            model = config.new_chat_model()
-        messages = ExecuteSubmit._apply_system_prompt_caching(config, messages)
-        response: AIMessage = ExecuteSubmit._call_model(model, messages)
-        return [*messages, response]
-
     @staticmethod
     def _is_anthropic_model(config: LLMConfig) -> bool:
         """Check if the model is an Anthropic model based on the config name."""
@@ -362,7 +366,3 @@ class ExecuteSubmit:
             return d
         else:
             raise ValueError(f"Unknown content type: {type(content)}")
-
-    @staticmethod
-    def _call_model(model: Runnable[list[BaseMessage], Any], messages: list[BaseMessage]) -> Any:
-        return model.with_retry(wait_exponential_jitter=True, stop_after_attempt=3).invoke(messages)
@@ -8,7 +8,7 @@ def _truncate_no_df_block(messages: list[BaseMessage]) -> AIMessage:
     text = f"""Message history was truncated. {len(messages) - 1} messages were deleted.
 
 Here is an answer, which was shown to the user:
-""" + str(messages[-1].content)
+{messages[-1].text}"""
     return AIMessage(content=text)
 
 
@@ -1,4 +1,5 @@
 import datetime
+import functools
 from pathlib import Path
 
 import jinja2
@@ -10,7 +11,9 @@ def get_today_date_str() -> str:
     return datetime.datetime.now().strftime("%A, %Y-%m-%d")
 
 
+@functools.cache
 def read_prompt_template(relative_path: Path) -> jinja2.Template:
+    # Templates ship with the package and never change at runtime, so load each one only once.
     env = _get_jinja_prompts_env()
     template = env.get_template(str(relative_path))
     return template
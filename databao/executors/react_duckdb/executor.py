@@ -2,6 +2,7 @@ import logging
 from typing import Any
 
 import duckdb
+from langchain_core.messages import AIMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph.state import CompiledStateGraph
 from sqlalchemy import Connection, Engine
@@ -11,14 +12,22 @@ from databao.core import Cache, ExecutionResult, Opa
 from databao.core.data_source import DBDataSource, DFDataSource, Sources
 from databao.core.executor import OutputModalityHints
 from databao.duckdb import register_sqlalchemy
-from databao.duckdb.react_tools import AgentResponse, execute_duckdb_sql, make_react_duckdb_agent
-from databao.duckdb.utils import get_db_path
+from databao.duckdb.react_tools import (
+    execute_duckdb_sql,
+    get_submitted_answer,
+    is_failed_submission,
+    make_react_duckdb_agent,
+)
+from databao.duckdb.utils import get_db_path, make_attach_sql
 from databao.executors.base import GraphExecutor
 
 logger = logging.getLogger(__name__)
 
 
 class ReactDuckDBExecutor(GraphExecutor):
+    MAX_SUBMIT_RETRIES = 2
+    """How many times the agent is resumed after a rejected submit_answer call."""
+
     def __init__(self) -> None:
         """Initialize agent with lazy graph compilation."""
         super().__init__()
@@ -27,10 +36,19 @@ class ReactDuckDBExecutor(GraphExecutor):
 
     def _create_graph(self, data_connection: Any, llm_config: LLMConfig) -> CompiledStateGraph[Any]:
         """Create and compile the ReAct DuckDB agent graph."""
-        return make_react_duckdb_agent(data_connection, llm_config.new_chat_model())
+        return make_react_duckdb_agent(data_connection, llm_config.chat_model())
+
+    def _get_compiled_graph(self, llm_config: LLMConfig) -> CompiledStateGraph[Any]:
+        """Get compiled graph (cached after first use)."""
+        compiled_graph = self._compiled_graph or self._create_graph(self._duckdb_connection, llm_config)
+        self._compiled_graph = compiled_graph
+
+        return compiled_graph
 
     def register_db(self, source: DBDataSource) -> None:
         """Register DB in the DuckDB connection."""
+        # The schema is baked into the agent's system prompt, so the graph must be rebuilt.
+        self._compiled_graph = None
         connection = source.db_connection
         if isinstance(connection, Connection):
             connection = connection.engine
@@ -39,7 +57,7 @@ class ReactDuckDBExecutor(GraphExecutor):
             path = get_db_path(connection)
             if path is not None:
                 connection.close()
-                self._duckdb_connection.execute(f"ATTACH '{path}' AS {source.name}")
+                self._duckdb_connection.execute(make_attach_sql(path, source.name))
             else:
                 raise RuntimeError("Memory-based DuckDB is not supported.")
         elif isinstance(connection, Engine):
@@ -48,6 +66,7 @@ class ReactDuckDBExecutor(GraphExecutor):
             raise ValueError("Only DuckDB or SQLAlchemy connections are supported.")
 
     def register_df(self, source: DFDataSource) -> None:
+        self._compiled_graph = None
         self._duckdb_connection.register(source.name, source.df)
 
     def execute(
@@ -60,8 +79,7 @@ class ReactDuckDBExecutor(GraphExecutor):
         rows_limit: int = 100,
         stream: bool = True,
     ) -> ExecutionResult:
-        # Get or create graph (cached after first use)
-        compiled_graph = self._compiled_graph or self._create_graph(self._duckdb_connection, llm_config)
+        compiled_graph = self._get_compiled_graph(llm_config)
 
         # Process the opa and get messages
         messages = self._process_opas(opas, cache)
@@ -70,16 +88,31 @@ class ReactDuckDBExecutor(GraphExecutor):
         init_state = {"messages": messages}
         invoke_config = RunnableConfig(recursion_limit=llm_config.agent_recursion_limit)
         last_state = self._invoke_graph_sync(compiled_graph, init_state, config=invoke_config, stream=stream)
-        answer: AgentResponse = last_state["structured_response"]
-        logger.info("Generated query: %s", answer.sql)
-        df = execute_duckdb_sql(answer.sql, self._duckdb_connection, limit=rows_limit)
+        final_messages = last_state.get("messages", [])
+        # submit_answer ends the run even if its arguments were invalid; resume so the model can see the error and retry
+        for _ in range(self.MAX_SUBMIT_RETRIES):
+            if not is_failed_submission(final_messages):
+                break
+            last_state = self._invoke_graph_sync(
+                compiled_graph, {"messages": final_messages}, config=invoke_config, stream=stream
+            )
+            final_messages = last_state.get("messages", [])
+        answer = get_submitted_answer(final_messages)
+        if answer is not None:
+            logger.info("Generated query: %s", answer.sql)
+            df = execute_duckdb_sql(answer.sql, self._duckdb_connection, limit=rows_limit)
+            execution_result = ExecutionResult(text=answer.explanation, code=answer.sql, df=df, meta={})
+        elif final_messages and isinstance(final_messages[-1], AIMessage):
+            # Sometimes models answer in plain text without submitting a query.
+            execution_result = ExecutionResult(text=final_messages[-1].text, meta={})
+        else:
+            raise RuntimeError(
+                f"The agent did not submit a valid answer after {self.MAX_SUBMIT_RETRIES} retries of submit_answer."
+            )
 
         # Update message history
-        final_messages = last_state.get("messages", [])
         self._update_message_history(cache, final_messages)
 
-        execution_result = ExecutionResult(text=answer.explanation, code=answer.sql, df=df, meta={})
-
         # Set modality hints
         execution_result.meta[OutputModalityHints.META_KEY] = self._make_output_modality_hints(execution_result)
 
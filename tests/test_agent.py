@@ -1,4 +1,8 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any
 
 import duckdb
 import pandas as pd
@@ -6,6 +10,7 @@ import pytest
 
 import databao
 from databao.configs import LLMConfigDirectory
+from databao.core import ExecutionResult, Opa
 
 
 @pytest.fixture
@@ -79,6 +84,17 @@ def test_add_df_with_string_context() -> None:
     assert agent.dfs["df1"].context == context_string
 
 
+def test_sources_views_are_read_only() -> None:
+    """agent.dbs/dfs reflect later additions but cannot be used to modify the agent."""
+    agent = _new_agent()
+    dfs = agent.dfs
+    agent.add_df(pd.DataFrame({"a": [1]}))
+
+    assert "df1" in dfs
+    with pytest.raises(TypeError):
+        dfs["df2"] = dfs["df1"]  # type: ignore[index]
+
+
 def test_add_additional_context_with_nonexistent_path_raises() -> None:
     """add_additional_context should raise if given a non-existent Path."""
     agent = _new_agent()
@@ -115,3 +131,50 @@ def test_add_additional_context_multiple_calls_mixed_sources(temp_context_file:
     assert first in agent.additional_context
     assert second in agent.additional_context
     assert third in agent.additional_context
+
+
+def test_lazy_thread_materializes_once_across_threads(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Concurrent reads of a lazy thread run the executor only once."""
+    agent = _new_agent()
+    agent.add_df(pd.DataFrame({"a": [1, 2, 3]}))
+    calls = []
+
+    def execute(*args: Any, **kwargs: Any) -> ExecutionResult:
+        calls.append(args)
+        time.sleep(0.05)
+        return ExecutionResult(text="answer", meta={})
+
+    monkeypatch.setattr(agent.executor, "execute", execute)
+    thread = agent.thread(lazy=True).ask("question")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        texts = list(pool.map(lambda _: thread.text(), range(4)))
+
+    assert texts == ["answer"] * 4
+    assert len(calls) == 1
+
+
+def test_lazy_ask_during_materialization_is_not_lost(monkeypatch: pytest.MonkeyPatch) -> None:
+    """An ask() while the previous question executes is kept for the next materialization."""
+    agent = _new_agent()
+    agent.add_df(pd.DataFrame({"a": [1, 2, 3]}))
+    started = threading.Event()
+    executed_queries = []
+
+    def execute(opas: list[Opa], *args: Any, **kwargs: Any) -> ExecutionResult:
+        started.set()
+        time.sleep(0.05)
+        executed_queries.append([opa.query for opa in opas])
+        return ExecutionResult(text=opas[-1].query, meta={})
+
+    monkeypatch.setattr(agent.executor, "execute", execute)
+    thread = agent.thread(lazy=True).ask("first")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        first_text = pool.submit(thread.text)
+        started.wait()
+        thread.ask("second")
+        assert first_text.result() == "first"
+
+    assert thread.text() == "second"
+    assert executed_queries == [["first"], ["second"]]
@@ -0,0 +1,54 @@
+import pandas as pd
+from langchain_core.messages import AIMessage, HumanMessage
+
+from databao.caches.in_mem_cache import InMemCache
+from databao.core.data_source import DFDataSource, Sources
+from databao.core.opa import Opa
+from databao.executors.lighthouse.executor import LighthouseExecutor
+
+
+def test_process_opas_does_not_mutate_cached_history() -> None:
+    cache = InMemCache()
+    cache.put("state", {"messages": [HumanMessage("first")]})
+
+    messages = LighthouseExecutor()._process_opas([Opa("second"), Opa("third")], cache)
+
+    assert [m.content for m in messages] == ["first", "second\n\nthird"]
+    assert [m.content for m in cache.get("state")["messages"]] == ["first"]
+
+
+def test_drop_last_opa_group_does_not_mutate_cached_history() -> None:
+    cache = InMemCache()
+    history = [HumanMessage("first"), AIMessage("answer"), HumanMessage("second"), AIMessage("answer")]
+    cache.put("state", {"messages": history})
+
+    LighthouseExecutor().drop_last_opa_group(cache, n=2)
+
+    assert cache.get("state")["messages"] == []
+    assert len(history) == 4
+
+
+def test_system_prompt_schema_refreshes_on_register() -> None:
+    executor = LighthouseExecutor()
+    sources = Sources(dfs={}, dbs={}, additional_context=[])
+    connection = executor._duckdb_connection
+
+    executor.register_df(DFDataSource(name="first_df", context="", df=pd.DataFrame({"a": [1]})))
+    prompt = executor.render_system_prompt(connection, sources)
+    assert "first_df" in prompt
+    assert executor.render_system_prompt(connection, sources) == prompt
+
+    executor.register_df(DFDataSource(name="second_df", context="", df=pd.DataFrame({"b": [1]})))
+    assert "second_df" in executor.render_system_prompt(connection, sources)
+
+
+def test_system_prompt_schema_refreshes_after_agent_ddl() -> None:
+    executor = LighthouseExecutor()
+    sources = Sources(dfs={}, dbs={}, additional_context=[])
+    connection = executor._duckdb_connection
+    executor.render_system_prompt(connection, sources)
+
+    run_sql_query = executor._graph.make_tools()[0]
+    run_sql_query.invoke({"sql": "CREATE TABLE agent_table (x INTEGER)", "graph_state": executor._graph.init_state([])})
+
+    assert "agent_table" in executor.render_system_prompt(connection, sources)
@@ -0,0 +1,13 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from databao.executors.lighthouse.history_cleaning import clean_tool_history
+
+
+def test_truncated_answer_keeps_text_of_content_blocks() -> None:
+    answer = AIMessage(content=[{"type": "text", "text": "The answer"}, {"type": "text", "text": " is 42."}])
+    messages = [HumanMessage("q"), AIMessage("a"), AIMessage("b"), AIMessage("c"), answer, HumanMessage("next")]
+
+    cleaned = clean_tool_history(messages, token_limit=0)
+
+    assert [m.type for m in cleaned] == ["human", "ai", "human"]
+    assert cleaned[1].text.endswith("shown to the user:\nThe answer is 42.")
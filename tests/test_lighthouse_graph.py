@@ -0,0 +1,96 @@
+from typing import Any
+
+import duckdb
+import pandas as pd
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatResult
+
+from databao.configs.llm import LLMConfig
+from databao.executors.lighthouse.graph import ExecuteSubmit
+
+
+@pytest.fixture
+def graph() -> ExecuteSubmit:
+    return ExecuteSubmit(duckdb.connect(":memory:"))
+
+
+def test_get_result_submit_called(graph: ExecuteSubmit) -> None:
+    df = pd.DataFrame({"a": [1, 2]})
+    submit = AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "submit_result",
+                "args": {"query_id": "1-0", "result_description": "Two rows", "visualization_prompt": ""},
+                "id": "call_1",
+            }
+        ],
+    )
+    state = graph.init_state([HumanMessage("q"), submit])
+    state["sql"] = "SELECT 1"
+    state["df"] = df
+    state["visualization_prompt"] = "bar chart"
+
+    result = graph.get_result(state)
+    assert result.text == "Two rows"
+    assert result.code == "SELECT 1"
+    assert result.df is df
+    assert result.meta["submit_called"] is True
+    assert result.meta["visualization_prompt"] == "bar chart"
+
+
+def test_get_result_without_submit(graph: ExecuteSubmit) -> None:
+    state = graph.init_state([HumanMessage("q"), AIMessage(content="Plain answer")])
+
+    result = graph.get_result(state)
+    assert result.text == "Plain answer"
+    assert result.df is None
+    assert result.meta["submit_called"] is False
+    assert result.meta["visualization_prompt"] is None
+
+
+def test_get_result_rejects_other_tool_call(graph: ExecuteSubmit) -> None:
+    message = AIMessage(content="", tool_calls=[{"name": "run_sql_query", "args": {"sql": "SELECT 1"}, "id": "c"}])
+    state = graph.init_state([HumanMessage("q"), message])
+
+    with pytest.raises(RuntimeError, match="Expected submit_result"):
+        graph.get_result(state)
+
+
+def test_system_prompt_caching_reuses_marked_copy(graph: ExecuteSubmit, monkeypatch: pytest.MonkeyPatch) -> None:
+    seen_system_messages: list[BaseMessage] = []
+
+    class FakeModel(GenericFakeChatModel):
+        def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+            return self
+
+        def _generate(self, messages: list[BaseMessage], *args: Any, **kwargs: Any) -> ChatResult:
+            seen_system_messages.append(messages[0])
+            return super()._generate(messages, *args, **kwargs)
+
+    def run_query(call_id: str) -> AIMessage:
+        return AIMessage(content="", tool_calls=[{"name": "run_sql_query", "args": {"sql": "SELECT 1"}, "id": call_id}])
+
+    responses = iter([run_query("a"), AIMessage("done"), run_query("b"), AIMessage("done")])
+    monkeypatch.setattr(LLMConfig, "chat_model", lambda self: FakeModel(messages=responses))
+    apply_caching = ExecuteSubmit._apply_system_prompt_caching
+    apply_calls = []
+
+    def counting_apply_caching(config: LLMConfig, messages: list[BaseMessage]) -> list[BaseMessage]:
+        apply_calls.append(messages[0])
+        return apply_caching(config, messages)
+
+    monkeypatch.setattr(ExecuteSubmit, "_apply_system_prompt_caching", staticmethod(counting_apply_caching))
+    compiled = graph.compile(LLMConfig(name="claude-sonnet-4-5", cache_system_prompt=True))
+
+    for prompt in ["first prompt", "second prompt"]:
+        compiled.invoke(graph.init_state([SystemMessage(prompt), HumanMessage("q")]))
+
+    assert [m.content for m in apply_calls] == ["first prompt", "second prompt"]
+    first_run, second_run = seen_system_messages[:2], seen_system_messages[2:]
+    assert first_run[0] is first_run[1]
+    assert second_run[0] is second_run[1]
+    assert [m.content[0]["text"] for m in (first_run[0], second_run[0])] == ["first prompt", "second prompt"]  # type: ignore[index]
+    assert second_run[0].content[0]["cache_control"] == {"type": "ephemeral"}  # type: ignore[index]
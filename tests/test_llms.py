@@ -1,10 +1,14 @@
 import warnings
+from collections import OrderedDict
 from pathlib import Path
 
 import pytest
 from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+from pydantic import SecretStr
 
 from databao.configs import LLMConfigDirectory
+from databao.configs import llm as llm_module
 from databao.configs.llm import LLMConfig, _parse_model_provider
 
 example_llm_config_paths = [
@@ -12,6 +16,12 @@ example_llm_config_paths = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def fresh_chat_model_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep chat models cached by one test from leaking into others."""
+    monkeypatch.setattr(llm_module, "_chat_models", OrderedDict())
+
+
 def _validate_llm_config(config: LLMConfig) -> None:
     if _parse_model_provider(config.name)[0] == "ollama":
         # Avoid downloading models during tests
@@ -60,3 +70,59 @@ def test_various_model_names(model_name: str, expected_provider: str, expected_n
     provider, name = _parse_model_provider(model_name)
     assert provider == expected_provider
     assert name == expected_name
+
+
+def test_chat_model_is_shared_between_equal_configs(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+    config = LLMConfig(name="gpt-4o-mini")
+
+    model = config.chat_model()
+    assert LLMConfig(name="gpt-4o-mini").chat_model() is model
+    assert config.model_copy(update={"temperature": 0.5}).chat_model() is not model
+    assert config.new_chat_model() is not model
+
+
+def test_chat_model_cache_tracks_provider_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "old_key")
+    config = LLMConfig(name="gpt-4o-mini")
+    model = config.chat_model()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "new_key")
+    assert config.chat_model() is not model
+    monkeypatch.setenv("UNRELATED_SETTING", "1")
+    assert config.chat_model() is config.chat_model()
+
+
+def test_chat_model_cache_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+    first = LLMConfig(name="gpt-4o-mini").chat_model()
+
+    for i in range(llm_module._CHAT_MODEL_CACHE_SIZE):
+        LLMConfig(name="gpt-4o-mini", max_tokens=i + 1).chat_model()
+
+    assert len(llm_module._chat_models) == llm_module._CHAT_MODEL_CACHE_SIZE
+    assert LLMConfig(name="gpt-4o-mini").chat_model() is not first
+
+
+def test_chat_model_is_created_without_holding_the_cache_lock(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test_key")
+    original = LLMConfig.new_chat_model
+    lock_held = []
+
+    def new_chat_model(self: LLMConfig) -> BaseChatModel:
+        lock_held.append(llm_module._chat_models_lock.locked())
+        return original(self)
+
+    monkeypatch.setattr(LLMConfig, "new_chat_model", new_chat_model)
+    LLMConfig(name="gpt-4o-mini").chat_model()
+    assert lock_held == [False]
+
+
+def test_chat_model_cache_distinguishes_secret_api_keys() -> None:
+    model_a = LLMConfig(name="gpt-4o-mini", model_kwargs={"api_key": SecretStr("key-a")}).chat_model()
+    model_b = LLMConfig(name="gpt-4o-mini", model_kwargs={"api_key": SecretStr("key-b")}).chat_model()
+
+    assert model_b is not model_a
+    assert isinstance(model_b, ChatOpenAI) and isinstance(model_b.openai_api_key, SecretStr)
+    assert model_b.openai_api_key.get_secret_value() == "key-b"
+    assert LLMConfig(name="gpt-4o-mini", model_kwargs={"api_key": SecretStr("key-a")}).chat_model() is model_a
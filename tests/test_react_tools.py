@@ -0,0 +1,102 @@
+import json
+from typing import Any
+
+import duckdb
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from databao.caches.in_mem_cache import InMemCache
+from databao.configs.llm import LLMConfig, LLMConfigDirectory
+from databao.core.data_source import Sources
+from databao.core.opa import Opa
+from databao.duckdb.react_tools import AgentResponse, get_submitted_answer, is_failed_submission, make_duckdb_tool
+from databao.executors.react_duckdb.executor import ReactDuckDBExecutor
+
+
+def test_duckdb_tool_preview() -> None:
+    con = duckdb.connect(":memory:")
+    execute_sql = make_duckdb_tool(con)
+
+    payload = json.loads(execute_sql.invoke({"sql": "SELECT i, 'a,b' AS s, NULL AS n FROM range(5) t(i)", "limit": 2}))
+    assert payload["columns"] == ["i", "s", "n"]
+    assert payload["rows"] == 'i,s,n\n0,"a,b",\n1,"a,b",\n'
+
+    payload = json.loads(execute_sql.invoke({"sql": "SELECT * FROM missing_table"}))
+    assert payload["columns"] == []
+    assert payload["note"].startswith("SQL error: CatalogException")
+
+
+def test_get_submitted_answer() -> None:
+    submit = AIMessage(
+        content="",
+        tool_calls=[{"name": "submit_answer", "args": {"sql": "SELECT 1", "explanation": "One"}, "id": "c1"}],
+    )
+    messages = [HumanMessage("q"), submit, ToolMessage("Answer submitted.", tool_call_id="c1")]
+    assert get_submitted_answer(messages) == AgentResponse(sql="SELECT 1", explanation="One")
+
+
+def test_get_submitted_answer_plain_text() -> None:
+    submit = AIMessage(
+        content="",
+        tool_calls=[{"name": "submit_answer", "args": {"sql": "SELECT 1", "explanation": "One"}, "id": "c1"}],
+    )
+    # Only the last AI message counts, an earlier submission is not reused.
+    messages = [HumanMessage("q"), submit, HumanMessage("q2"), AIMessage("Plain answer")]
+    assert get_submitted_answer(messages) is None
+
+
+def test_get_submitted_answer_invalid_args() -> None:
+    submit = AIMessage(content="", tool_calls=[{"name": "submit_answer", "args": {"sql": "SELECT 1"}, "id": "c1"}])
+    rejected = ToolMessage(
+        "Error: explanation: Field required", tool_call_id="c1", name="submit_answer", status="error"
+    )
+
+    assert get_submitted_answer([HumanMessage("q"), submit]) is None
+    assert get_submitted_answer([HumanMessage("q"), submit, rejected]) is None
+    assert is_failed_submission([HumanMessage("q"), submit, rejected])
+    assert not is_failed_submission([HumanMessage("q"), submit])
+
+
+def test_executor_retries_rejected_submission(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FakeModel(GenericFakeChatModel):
+        def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+            return self
+
+    responses = iter(
+        [
+            AIMessage(content="", tool_calls=[{"name": "submit_answer", "args": {"sql": "SELECT 1"}, "id": "c1"}]),
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "submit_answer", "args": {"sql": "SELECT 1 AS a", "explanation": "One"}, "id": "c2"}
+                ],
+            ),
+        ]
+    )
+    monkeypatch.setattr(LLMConfig, "chat_model", lambda self: FakeModel(messages=responses))
+
+    executor = ReactDuckDBExecutor()
+    sources = Sources(dfs={}, dbs={}, additional_context=[])
+    result = executor.execute([Opa("q")], InMemCache(), LLMConfigDirectory.DEFAULT, sources, stream=False)
+
+    assert result.text == "One"
+    assert result.code == "SELECT 1 AS a"
+    assert result.df is not None and result.df["a"].tolist() == [1]
+
+
+def test_executor_fails_when_submissions_keep_being_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FakeModel(GenericFakeChatModel):
+        def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+            return self
+
+    invalid_submit = AIMessage(
+        content="", tool_calls=[{"name": "submit_answer", "args": {"sql": "SELECT 1"}, "id": "c1"}]
+    )
+    responses = iter([invalid_submit] * (ReactDuckDBExecutor.MAX_SUBMIT_RETRIES + 1))
+    monkeypatch.setattr(LLMConfig, "chat_model", lambda self: FakeModel(messages=responses))
+
+    executor = ReactDuckDBExecutor()
+    sources = Sources(dfs={}, dbs={}, additional_context=[])
+    with pytest.raises(RuntimeError, match="did not submit a valid answer"):
+        executor.execute([Opa("q")], InMemCache(), LLMConfigDirectory.DEFAULT, sources, stream=False)